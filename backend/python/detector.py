@@ -4,19 +4,32 @@ YOLOv7 Human Detection and Video Recorder
 Continuously monitors webcam feed for humans and records video clips when detected.
 """
 
+import asyncio
+from collections import deque
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+import queue
+import signal
 import cv2
-import torch
 import numpy as np
 import os
 import subprocess
-from datetime import datetime
+from datetime import datetime, timezone
 import time
-import pytz
 import shutil
+import ctypes
+
+# TurboJPEG is optional; MJPEG frames are decoded with OpenCV without it
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+except ImportError:
+    TurboJPEG = None
 
 # Configuration
 VIDEO_DIR = os.getenv('VIDEO_DIR', '/tmp/videos')
 CAMERA_INDEX = 0  # /dev/video0
+INFERENCE_DEVICE = os.getenv('INFERENCE_DEVICE', 'auto')  # 'auto' (GPU if the NVIDIA driver reports one), 'cuda' or 'cpu'
+CAMERA_FORMAT = os.getenv('CAMERA_FORMAT', 'MJPG')  # 'MJPG' (compressed) or 'YUYV' (raw, no compression loss)
 FRAME_WIDTH = 640
 FRAME_HEIGHT = 480
 FPS = 30
@@ -26,13 +39,167 @@ CONFIDENCE_THRESHOLD = 0.45
 PERSON_CLASS_ID = 0  # COCO dataset class ID for 'person'
 COOLDOWN_PERIOD_SEC = 10  # Wait 10 seconds between detections
 PROCESS_EVERY_N_FRAMES = 5  # Only run detection every 5th frame for performance
+WARMUP_RUNS = 3  # Dummy inferences at startup so the first real frame isn't slowed by lazy initialization
+GPU_BATCH_SIZE = 4  # Sampled frames per YOLO call on a GPU; CPU inference takes single frames to keep latency low
+MOTION_SIZE = (80, 60)  # Grayscale thumbnail size used for the motion check
+MOTION_THRESHOLD = MOTION_SIZE[0] * MOTION_SIZE[1] * 5  # Summed abs diff (~5 levels per pixel) that counts as motion
 MIN_FREE_DISK_SPACE_MB = 500  # Minimum free disk space in MB before recording
+ENCODE_QUEUE_SIZE = 2  # Recorded clips waiting for FFmpeg to finish
+FFMPEG_TIMEOUT_SEC = 30
+TIMESTAMP_FORMAT = '%d-%m-%Y_%H-%M-%S'  # UTC timestamp in video filenames
+PARTIAL_SUFFIX = '.part'  # Appended to videos while FFmpeg is still writing them
+
+# H.264 encoders in order of preference: NVIDIA NVENC, Raspberry Pi V4L2 M2M, then software x264
+H264_ENCODERS = [
+    ['-c:v', 'h264_nvenc', '-preset', 'p1', '-tune', 'll'],
+    ['-c:v', 'h264_v4l2m2m', '-b:v', '4M'],
+    ['-c:v', 'libx264', '-preset', 'ultrafast'],
+]
+INFERENCE_SIZE = 320  # Square model input size; plenty for a doorway and ~4x cheaper than 640
+ONNX_OPSET = 16
+TRT_WORKSPACE_MB = 1024  # TensorRT builder workspace size
+FRAME_SLOTS = 2  # Shared-memory batch buffers between capture and the inference process (ping-pong)
+
+# Numba is optional and only imported for YUYV cameras; frames are converted with OpenCV without it
+njit = None
+if CAMERA_FORMAT == 'YUYV':
+    try:
+        from numba import njit, prange
+    except ImportError:
+        pass
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def yuyv_to_chw(src, dst):
+        """
+        Convert a raw YUYV frame (H x W*2 bytes) into a normalized RGB CHW float32
+        image in one pass: colour conversion, nearest-neighbour resize, /255 and
+        transpose. dst has shape (3, size, size).
+        """
+        height = src.shape[0]
+        width = src.shape[1] // 2
+        out_height = dst.shape[1]
+        out_width = dst.shape[2]
+
+        for oy in prange(out_height):
+            row = src[oy * height // out_height]
+            for ox in range(out_width):
+                # Each 4-byte group Y0 U Y1 V covers two pixels
+                sx = ox * width // out_width
+                pair = (sx // 2) * 4
+                y = 1.164 * (row[2 * sx] - 16.0)
+                u = row[pair + 1] - 128.0
+                v = row[pair + 3] - 128.0
+
+                # BT.601 limited range, as OpenCV's COLOR_YUV2RGB_YUYV
+                r = y + 1.596 * v
+                g = y - 0.391 * u - 0.813 * v
+                b = y + 2.018 * u
+
+                dst[0, oy, ox] = min(max(r, 0.0), 255.0) / 255.0
+                dst[1, oy, ox] = min(max(g, 0.0), 255.0) / 255.0
+                dst[2, oy, ox] = min(max(b, 0.0), 255.0) / 255.0
+else:
+    yuyv_to_chw = None
+
+# PyTorch is heavy to import, so it's only loaded when needed (see import_torch)
+torch = None
+
+def import_torch():
+    """Import PyTorch on first use and return it."""
+    global torch
+    if torch is None:
+        import torch as torch_module
+        # Allow TF32 tensor-core matmuls when running on a GPU
+        torch_module.set_float32_matmul_precision('high')
+        torch = torch_module
+    return torch
+
+# TensorRT and pycuda are optional and only imported on CUDA machines (see import_tensorrt)
+trt = None
+cuda = None
+
+def import_tensorrt():
+    """Import TensorRT and pycuda on first use. Returns False if they aren't installed."""
+    global trt, cuda
+    if trt is None:
+        try:
+            import tensorrt as trt_module
+            import pycuda.driver as cuda_module
+        except ImportError:
+            return False
+        trt, cuda = trt_module, cuda_module
+    return True
+
+def cuda_available():
+    """Check for a CUDA GPU through the NVIDIA driver library, without importing PyTorch."""
+    try:
+        libcuda = ctypes.CDLL('libcuda.so.1')
+    except OSError:
+        return False
+    count = ctypes.c_int()
+    return (libcuda.cuInit(0) == 0
+            and libcuda.cuDeviceGetCount(ctypes.byref(count)) == 0
+            and count.value > 0)
 
 class HumanDetector:
     def __init__(self, model_path='yolov7-tiny.pt'):
-        """Initialize the human detector with YOLOv7 model."""
+        """
+        Initialize the human detector. The YOLOv7 model itself is loaded
+        in the inference process (see load_model).
+        """
+        self.model_path = model_path
+
+        # Camera frames are BGR unless the camera delivers MJPEG or YUYV (see configure_frame_format)
+        self.frame_format = 'bgr'
+        self.frame_size = (FRAME_WIDTH, FRAME_HEIGHT)
+
+        if INFERENCE_DEVICE == 'auto':
+            self.device = 'cuda' if cuda_available() else 'cpu'
+        else:
+            self.device = INFERENCE_DEVICE
+        self.batch_size = GPU_BATCH_SIZE if self.device == 'cuda' else 1
+
+        # Ensure video directory exists
+        os.makedirs(VIDEO_DIR, exist_ok=True)
+        print(f"Video directory: {VIDEO_DIR}")
+
+        self.encoder_args = self.select_encoder()
+
+        self.last_detection_time = 0
+        self.previous_thumbnail = None
+        self.busy_slot = None  # Shared-memory slot the inference process is reading
+
+    def load_model(self, model_path):
+        """Load the YOLOv7 model with the fastest available backend and warm it up."""
         print("Loading YOLOv7 model...")
 
+        self.jpeg = self.load_jpeg_decoder()
+
+        # Input tensor is reused across frames to avoid per-frame allocations
+        self._input = np.empty((self.batch_size, 3, INFERENCE_SIZE, INFERENCE_SIZE), dtype=np.float32)
+
+        # On a CUDA GPU prefer a TensorRT FP16 engine, then FP16 PyTorch;
+        # otherwise INT8 ONNX Runtime on CPU (Raspberry Pi)
+        if self.device == 'cuda' and import_tensorrt() and self.load_trt_engine(model_path):
+            self.backend = 'tensorrt'
+        elif self.device == 'cuda':
+            self.backend = 'torch'
+            self.load_torch_model(model_path)
+        else:
+            self.backend = 'onnxruntime'
+            self.load_onnx_session(model_path)
+
+        print(f"Model loaded successfully with {self.backend} on {self.device} (confidence threshold: {CONFIDENCE_THRESHOLD})")
+
+        # The inference process starts after the camera is configured, so this uses the real frame format
+        self.warm_up()
+
+    def load_weights(self, model_path):
+        """
+        Load the raw YOLOv7 PyTorch model (no AutoShape wrapper) on the CPU.
+        The returned model takes a normalized NCHW tensor.
+        """
         # Check if model exists
         if not os.path.exists(model_path):
             print(f"ERROR: Model file not found: {model_path}")
@@ -40,40 +207,379 @@ class HumanDetector:
             print("  wget https://github.com/WongKinYiu/yolov7/releases/download/v0.1/yolov7-tiny.pt")
             raise FileNotFoundError(f"Model file not found: {model_path}")
 
-        # Load YOLOv7 model (CPU only for Raspberry Pi)
-        self.model = torch.hub.load('WongKinYiu/yolov7', 'custom', model_path, trust_repo=True)
-        self.model.conf = CONFIDENCE_THRESHOLD
-        self.model.cpu()  # Force CPU mode
-        self.model.eval()
+        import_torch()
+        model = torch.hub.load('WongKinYiu/yolov7', 'custom', model_path, autoshape=False, trust_repo=True)
+        model.cpu()
+        model.fuse()
+        model.eval()
+        return model
 
-        print(f"Model loaded successfully (confidence threshold: {CONFIDENCE_THRESHOLD})")
+    def artifact_path(self, model_path, extension):
+        """
+        Path for a model file derived from the weights, e.g. yolov7-tiny-320.onnx
+        or yolov7-tiny-320-b4.trt. The input size and batch size are part of the
+        name since exported models have fixed shapes.
+        """
+        batch = f"-b{self.batch_size}" if self.batch_size > 1 else ''
+        return f"{os.path.splitext(model_path)[0]}-{INFERENCE_SIZE}{batch}{extension}"
+
+    def load_torch_model(self, model_path):
+        """Load the YOLOv7 model onto the GPU in half precision."""
+        self.model = self.load_weights(model_path)
+        self.model.to(self.device, memory_format=torch.channels_last)  # NHWC convs are tensor-core friendly
+        self.model.half()
+
+        # Input shapes never change, so let cuDNN benchmark and cache the fastest conv algorithms
+        torch.backends.cudnn.benchmark = True
+
+        # Preprocess into pinned host memory (shared with self._input) so the
+        # upload can run asynchronously into a GPU tensor that is reused every frame.
+        # The copy also converts the NCHW host layout to channels_last on the GPU.
+        shape = (self.batch_size, 3, INFERENCE_SIZE, INFERENCE_SIZE)
+        self._host_input = torch.empty(shape, dtype=torch.float32, pin_memory=True)
+        self._device_input = torch.empty(shape, dtype=torch.float16, device=self.device,
+                                         memory_format=torch.channels_last)
+        self._input = self._host_input.numpy()
+
+        # Trace and freeze the network so TorchScript can fuse its element-wise ops
+        try:
+            with torch.no_grad():
+                traced = torch.jit.trace(self.model, self._device_input, strict=False)
+                self.model = torch.jit.optimize_for_inference(traced)
+        except Exception as e:
+            print(f"WARNING: TorchScript tracing failed, running the model eagerly: {e}")
 
-        # Ensure video directory exists
-        os.makedirs(VIDEO_DIR, exist_ok=True)
-        print(f"Video directory: {VIDEO_DIR}")
+    def load_trt_engine(self, model_path):
+        """
+        Load (building once if needed) a TensorRT FP16 engine from the ONNX export.
+        Returns True if the engine is ready, False to fall back to PyTorch.
+        """
+        engine_path = self.artifact_path(model_path, '.trt')
+        if not os.path.exists(engine_path) and not self.build_trt_engine(model_path, engine_path):
+            return False
+
+        # Only create a CUDA context once there is an engine to run. Use the device's
+        # primary context (shared with the CUDA runtime), current on the inference process's thread
+        cuda.init()
+        self.cuda_context = cuda.Device(0).retain_primary_context()
+        self.cuda_context.push()
+
+        runtime = trt.Runtime(trt.Logger(trt.Logger.WARNING))
+        with open(engine_path, 'rb') as f:
+            self.engine = runtime.deserialize_cuda_engine(f.read())
+
+        # A cached engine from another TensorRT version or GPU doesn't deserialize; rebuild it once
+        if self.engine is None:
+            print(f"WARNING: Cached TensorRT engine is incompatible, rebuilding: {engine_path}")
+            if self.build_trt_engine(model_path, engine_path):
+                with open(engine_path, 'rb') as f:
+                    self.engine = runtime.deserialize_cuda_engine(f.read())
+
+        if self.engine is None:
+            print("WARNING: Failed to load TensorRT engine, falling back to PyTorch")
+            self.cuda_context.pop()
+            self.cuda_context.detach()
+            return False
+
+        self.context = self.engine.create_execution_context()
+        self.stream = cuda.Stream()
+
+        # Pinned host + device buffers for every I/O tensor, bound to the context once
+        self.trt_buffers = {}
+        for i in range(self.engine.num_io_tensors):
+            name = self.engine.get_tensor_name(i)
+            shape = tuple(self.engine.get_tensor_shape(name))
+            dtype = trt.nptype(self.engine.get_tensor_dtype(name))
+
+            host = cuda.pagelocked_empty(shape, dtype)
+            device = cuda.mem_alloc(host.nbytes)
+            self.context.set_tensor_address(name, int(device))
+            self.trt_buffers[name] = (host, device)
+
+            if self.engine.get_tensor_mode(name) == trt.TensorIOMode.INPUT:
+                self.trt_input = name
+
+        # Preprocess straight into the pinned input buffer
+        self._input = self.trt_buffers[self.trt_input][0]
+
+        print(f"TensorRT engine: {engine_path}")
+        return True
+
+    def build_trt_engine(self, model_path, engine_path):
+        """
+        Build a TensorRT FP16 engine from the ONNX export with the TensorRT builder API.
+        Only needs to run once; returns True if the engine was saved.
+        """
+        onnx_path = self.export_onnx(model_path)
+        print(f"Building TensorRT engine (one-time): {engine_path}")
 
-        self.last_detection_time = 0
+        logger = trt.Logger(trt.Logger.WARNING)
+        builder = trt.Builder(logger)
+        network = builder.create_network(1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH))
+        parser = trt.OnnxParser(network, logger)
+
+        if not parser.parse_from_file(onnx_path):
+            errors = '; '.join(str(parser.get_error(i)) for i in range(parser.num_errors))
+            print(f"WARNING: Failed to parse {onnx_path}, falling back to PyTorch: {errors}")
+            return False
+
+        config = builder.create_builder_config()
+        config.set_memory_pool_limit(trt.MemoryPoolType.WORKSPACE, TRT_WORKSPACE_MB * 1024 * 1024)
+        config.set_flag(trt.BuilderFlag.FP16)
+
+        serialized_engine = builder.build_serialized_network(network, config)
+        if serialized_engine is None:
+            print("WARNING: TensorRT engine build failed, falling back to PyTorch")
+            return False
+
+        with open(engine_path, 'wb') as f:
+            f.write(serialized_engine)
+
+        return True
 
-    def detect_human(self, frame):
+    def load_onnx_session(self, model_path):
         """
-        Detect humans in a frame using YOLOv7.
-        Returns True if a human is detected with sufficient confidence.
+        Load the INT8 ONNX model into an ONNX Runtime CPU session.
+        Falls back to the FP32 model if the INT8 one can't be loaded.
         """
-        # Run inference
-        results = self.model(frame)
+        import onnxruntime as ort
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        # Export and quantize once; later starts reuse the INT8 model.
+        # Unsigned weights: ONNX Runtime's CPU ConvInteger kernel only takes uint8
+        quantized_path = self.artifact_path(model_path, '.int8.onnx')
+        if not os.path.exists(quantized_path):
+            onnx_path = self.export_onnx(model_path)
+            print(f"Quantizing {onnx_path} to INT8...")
+            quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QUInt8)
+            print(f"Quantized model saved: {quantized_path}")
+
+        # Use every core for intra-op parallelism
+        sess_options = ort.SessionOptions()
+        sess_options.intra_op_num_threads = os.cpu_count()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
 
-        # Check detections
-        detections = results.xyxy[0].cpu().numpy()  # x1, y1, x2, y2, confidence, class
+        try:
+            self.session = ort.InferenceSession(quantized_path, sess_options, providers=['CPUExecutionProvider'])
+            print(f"ONNX model: {quantized_path}")
+        except Exception as e:
+            onnx_path = self.export_onnx(model_path)
+            print(f"WARNING: Failed to load INT8 model, using FP32 {onnx_path}: {e}")
+            self.session = ort.InferenceSession(onnx_path, sess_options, providers=['CPUExecutionProvider'])
 
-        for detection in detections:
-            class_id = int(detection[5])
-            confidence = detection[4]
+        self.input_name = self.session.get_inputs()[0].name
 
-            if class_id == PERSON_CLASS_ID and confidence >= CONFIDENCE_THRESHOLD:
-                print(f"Human detected! Confidence: {confidence:.2f}")
-                return True
+    def export_onnx(self, model_path):
+        """
+        Export the YOLOv7 PyTorch weights to ONNX.
+        Only needs to run once; returns the path to the cached ONNX model.
+        """
+        onnx_path = self.artifact_path(model_path, '.onnx')
+        if os.path.exists(onnx_path):
+            return onnx_path
 
-        return False
+        model = self.load_weights(model_path)
+        print(f"Exporting {model_path} to ONNX (one-time)...")
+
+        dummy = torch.zeros(self.batch_size, 3, INFERENCE_SIZE, INFERENCE_SIZE)
+        with torch.no_grad():
+            torch.onnx.export(model, dummy, onnx_path, opset_version=ONNX_OPSET,
+                              input_names=['images'], output_names=['output'])
+
+        return onnx_path
+
+    def warm_up(self):
+        """
+        Run a few inferences on blank frames in the camera's format, so cuDNN autotuning,
+        TorchScript optimization, ONNX Runtime/TensorRT lazy setup, the Numba YUYV
+        kernel compile and TurboJPEG setup happen before the first real frame.
+        """
+        start_time = time.time()
+
+        width, height = self.frame_size
+        blank = np.zeros((height, width, 3), dtype=np.uint8)
+        if self.frame_format == 'mjpeg':
+            blank = cv2.imencode('.jpg', blank)[1].reshape(1, -1)
+        elif self.frame_format == 'yuyv':
+            blank = np.zeros((height, width * 2), dtype=np.uint8)
+
+        frames = [blank] * self.batch_size
+        for _ in range(WARMUP_RUNS):
+            self.detect_human(frames)
+
+        print(f"Model warmed up in {time.time() - start_time:.2f} seconds")
+
+    def load_jpeg_decoder(self):
+        """Load TurboJPEG if it and libturbojpeg are installed, otherwise return None."""
+        if TurboJPEG is None:
+            return None
+
+        try:
+            return TurboJPEG()
+        except (OSError, RuntimeError) as e:
+            print(f"WARNING: TurboJPEG unavailable, decoding MJPEG with OpenCV: {e}")
+            return None
+
+    def decode_jpeg(self, frame):
+        """
+        Decode a compressed MJPEG frame to RGB at half resolution.
+        Half of 640x480 is still at least as wide as the model input.
+        Returns None if the frame is corrupt.
+        """
+        if self.jpeg is not None:
+            try:
+                return self.jpeg.decode(frame, pixel_format=TJPF_RGB, scaling_factor=(1, 2))
+            except OSError:
+                return None
+
+        bgr = cv2.imdecode(frame, cv2.IMREAD_REDUCED_COLOR_2)
+        if bgr is None:
+            return None
+        return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+    def preprocess(self, frames):
+        """
+        Convert a batch of camera frames into the model's normalized NCHW float32 input.
+        Writes into the preallocated input buffer and returns it.
+        """
+        for index, frame in enumerate(frames):
+            self.preprocess_frame(frame, self._input[index])
+        return self._input
+
+    def preprocess_frame(self, frame, out):
+        """Convert one camera frame into a normalized CHW float32 image in out."""
+        width, height = self.frame_size
+
+        if self.frame_format == 'yuyv' and yuyv_to_chw is not None:
+            # Single fused pass straight into the input buffer
+            yuyv_to_chw(frame.reshape(height, width * 2), out)
+            return
+
+        size = (INFERENCE_SIZE, INFERENCE_SIZE)
+        if self.frame_format == 'mjpeg':
+            rgb = self.decode_jpeg(frame)
+            if rgb is None:
+                # Corrupt frame: leave a blank image, which can't contain a person
+                out.fill(0)
+                return
+            rgb = cv2.resize(rgb, size, interpolation=cv2.INTER_LINEAR)
+        elif self.frame_format == 'yuyv':
+            rgb = cv2.cvtColor(frame.reshape(height, width, 2), cv2.COLOR_YUV2RGB_YUYV)
+            rgb = cv2.resize(rgb, size, interpolation=cv2.INTER_LINEAR)
+        else:
+            resized = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+            rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+
+        np.divide(rgb.transpose(2, 0, 1), 255.0, out=out)
+
+    def infer_torch(self, frames):
+        """
+        Run the GPU model on a batch of frames under FP16 autocast.
+        Returns the highest person confidence (0 if there is no person).
+        """
+        self.preprocess(frames)
+
+        with torch.inference_mode(), torch.autocast(self.device, dtype=torch.float16):
+            self._device_input.copy_(self._host_input, non_blocking=True)
+            predictions = self.model(self._device_input)[0].flatten(0, 1)  # All frames' rows together
+
+            # Filter on the GPU; boolean indexing would force a sync, so mask instead
+            class_scores = predictions[:, 5:]
+            confidences = predictions[:, 4] * class_scores[:, PERSON_CLASS_ID]
+            hits = (class_scores.argmax(dim=1) == PERSON_CLASS_ID) & (confidences >= CONFIDENCE_THRESHOLD)
+
+            # Only this one scalar is copied back to the host
+            return torch.where(hits, confidences, 0).max().item()
+
+    def infer_trt(self, frames):
+        """
+        Run the TensorRT engine on a batch of frames.
+        Copies in, executes and copies out on a single CUDA stream.
+        """
+        self.preprocess(frames)
+
+        host_in, device_in = self.trt_buffers[self.trt_input]
+        host_out, device_out = self.trt_buffers['output']
+
+        cuda.memcpy_htod_async(device_in, host_in, self.stream)
+        self.context.execute_async_v3(self.stream.handle)
+        cuda.memcpy_dtoh_async(host_out, device_out, self.stream)
+        self.stream.synchronize()
+
+        return host_out
+
+    def person_confidence(self, predictions):
+        """
+        Highest person confidence among raw YOLOv7 predictions on the host
+        (rows of x, y, w, h, objectness, class scores...) for a whole batch.
+        Returns 0 if there is no person.
+        """
+        predictions = predictions.reshape(-1, predictions.shape[-1])
+
+        # Confidence is objectness * class score, so objectness alone rules most rows out
+        candidates = predictions[predictions[:, 4] >= CONFIDENCE_THRESHOLD]
+        if len(candidates) == 0:
+            return 0.0
+
+        class_scores = candidates[:, 5:]
+        confidences = candidates[:, 4] * class_scores[:, PERSON_CLASS_ID]
+        hits = (class_scores.argmax(axis=1) == PERSON_CLASS_ID) & (confidences >= CONFIDENCE_THRESHOLD)
+
+        if not hits.any():
+            return 0.0
+
+        return float(confidences[hits].max())
+
+    def motion_detected(self, frames):
+        """
+        Cheap motion check: compare a tiny grayscale thumbnail of each frame with
+        the previous one. Lets YOLO sleep while nothing in the scene changes.
+        """
+        # Check every frame (no short-circuit) so the previous thumbnail stays current
+        return any([self.frame_changed(frame) for frame in frames])
+
+    def frame_changed(self, frame):
+        """Return True if a frame differs enough from the previously checked one."""
+        width, height = self.frame_size
+
+        # Get a small grayscale image as cheaply as each frame format allows
+        if self.frame_format == 'mjpeg':
+            gray = cv2.imdecode(frame, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+            if gray is None:
+                return False  # Corrupt frame, treat as no motion
+        elif self.frame_format == 'yuyv':
+            gray = frame.reshape(height, width * 2)[::8, ::16]  # Every 8th pixel's Y byte
+        else:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        thumbnail = cv2.resize(gray, MOTION_SIZE, interpolation=cv2.INTER_AREA)
+        previous, self.previous_thumbnail = self.previous_thumbnail, thumbnail
+
+        if previous is None:
+            return True
+
+        return int(cv2.absdiff(thumbnail, previous).sum()) >= MOTION_THRESHOLD
+
+    def detect_human(self, frames):
+        """
+        Detect humans in a batch of frames using YOLOv7.
+        Returns True if a human is detected with sufficient confidence in any of them.
+        """
+        # Run inference
+        if self.backend == 'torch':
+            confidence = self.infer_torch(frames)
+        elif self.backend == 'tensorrt':
+            confidence = self.person_confidence(self.infer_trt(frames))
+        else:
+            # Only fetch the predictions, not the Detect head's raw feature maps
+            outputs = self.session.run(['output'], {self.input_name: self.preprocess(frames)})
+            confidence = self.person_confidence(outputs[0])
+
+        if confidence < CONFIDENCE_THRESHOLD:
+            return False
+
+        print(f"Human detected! Confidence: {confidence:.2f}")
+        return True
 
     def check_disk_space(self):
         """
@@ -95,112 +601,201 @@ class HumanDetector:
             # If we can't check, assume it's OK (fail open)
             return True
 
-    def record_video(self, cap):
+    def select_encoder(self):
+        """
+        Pick the fastest H.264 encoder that actually works on this machine.
+        Each candidate is probed with a one-frame test encode, since FFmpeg builds
+        list hardware encoders even when the hardware isn't present.
         """
-        Record a 5-second video clip from the webcam.
-        Returns the path to the temporary raw video file.
+        for encoder_args in H264_ENCODERS:
+            cmd = [
+                'ffmpeg', '-hide_banner',
+                '-f', 'lavfi', '-i', f'color=size={FRAME_WIDTH}x{FRAME_HEIGHT}',
+                '-frames:v', '1',
+                *encoder_args,
+                '-f', 'null', '-'
+            ]
+
+            try:
+                result = subprocess.run(cmd, capture_output=True, timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                continue
+
+            if result.returncode == 0:
+                print(f"Using H.264 encoder: {encoder_args[1]}")
+                return encoder_args
+
+        print("WARNING: No H.264 encoder probe succeeded, using FFmpeg defaults")
+        return []
+
+    def read_recording_frame(self, cap):
         """
-        timestamp = datetime.now(pytz.UTC).strftime('%d-%m-%Y_%H-%M-%S')
-        temp_filename = f'person_detected_{timestamp}_temp.mp4'
-        temp_filepath = os.path.join(VIDEO_DIR, temp_filename)
+        Read a frame for recording, ready to write to FFmpeg.
+        BGR frames are converted to planar YUV420 (the encoder's own format, half
+        the bytes of BGR) so FFmpeg doesn't need a colour conversion pass.
+        """
+        ret, frame = cap.read()
+        if ret and self.frame_format == 'bgr':
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420)
+        return ret, frame
 
-        print(f"Recording video: {temp_filename}")
+    async def record_video(self, cap):
+        """
+        Record a 5-second video clip from the webcam, piping raw frames into a
+        single FFmpeg process that speeds it up to 3 seconds as it encodes.
+        Returns the FFmpeg process and the partial output path, or None on failure.
+        """
+        loop = asyncio.get_running_loop()
 
-        # Define codec and create VideoWriter
-        # Use 'avc1' (H.264) codec for macOS compatibility
-        fourcc = cv2.VideoWriter_fourcc(*'avc1')
-        out = cv2.VideoWriter(temp_filepath, fourcc, FPS, (FRAME_WIDTH, FRAME_HEIGHT))
+        timestamp = datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+        filename = f'person_detected_{timestamp}.mp4'
+        # Not an .mp4 name, so the file watcher only picks up the finished video
+        partial_filepath = os.path.join(VIDEO_DIR, filename + PARTIAL_SUFFIX)
 
-        # Check if VideoWriter opened successfully
-        if not out.isOpened():
-            print(f"ERROR: Failed to open VideoWriter with avc1 codec, trying mp4v...")
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(temp_filepath, fourcc, FPS, (FRAME_WIDTH, FRAME_HEIGHT))
+        # Calculate speed factor: 5s -> 3s = 1.67x speed
+        speed_factor = RECORDING_DURATION_SEC / TARGET_DURATION_SEC
+        pts_factor = 1.0 / speed_factor  # PTS factor is inverse of speed
 
-            if not out.isOpened():
-                print(f"ERROR: Failed to open VideoWriter with any codec!")
-                return None
+        ret, frame = await loop.run_in_executor(None, self.read_recording_frame, cap)
+        if not ret:
+            print("ERROR: Failed to read frame to start recording")
+            return None
+
+        # Frames go to FFmpeg in the camera's native format (BGR as YUV420); raw formats need the size
+        if self.frame_format == 'mjpeg':
+            input_args = ['-f', 'mjpeg']
+        elif self.frame_format == 'yuyv':
+            width, height = self.frame_size
+            input_args = ['-f', 'rawvideo', '-pix_fmt', 'yuyv422', '-s', f'{width}x{height}']
+        else:
+            height, width = frame.shape[0] * 2 // 3, frame.shape[1]  # I420 stacks U and V under Y
+            input_args = ['-f', 'rawvideo', '-pix_fmt', 'yuv420p', '-s', f'{width}x{height}']
+
+        print(f"Recording video ({speed_factor:.2f}x speed-up): {filename}")
+
+        cmd = [
+            'ffmpeg',
+            '-loglevel', 'error',  # Keep stderr small so its pipe can't fill mid-recording
+            *input_args,
+            '-framerate', str(FPS),
+            '-i', '-',
+            '-filter:v', f'setpts={pts_factor:.3f}*PTS',
+            *self.encoder_args,
+            '-pix_fmt', 'yuv420p',
+            '-an',  # No audio track
+            '-f', 'mp4',
+            '-y',  # Overwrite output file
+            partial_filepath
+        ]
+
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except Exception as e:
+            print(f"ERROR: Failed to start FFmpeg: {e}")
+            return None
 
         num_frames = int(RECORDING_DURATION_SEC * FPS)
         frames_recorded = 0
 
         start_time = time.time()
 
-        while frames_recorded < num_frames:
-            ret, frame = cap.read()
-            if not ret:
-                print("WARNING: Failed to read frame during recording")
-                break
+        try:
+            while True:
+                proc.stdin.write(frame.tobytes())
+                await proc.stdin.drain()
+                frames_recorded += 1
 
-            out.write(frame)
-            frames_recorded += 1
+                if frames_recorded >= num_frames:
+                    break
 
-        out.release()
+                ret, frame = await loop.run_in_executor(None, self.read_recording_frame, cap)
+                if not ret:
+                    print("WARNING: Failed to read frame during recording")
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            print("ERROR: FFmpeg exited during recording")
+        finally:
+            proc.stdin.close()
 
         elapsed = time.time() - start_time
         print(f"Recorded {frames_recorded} frames in {elapsed:.2f} seconds")
 
-        # Verify file was created and has content
-        if not os.path.exists(temp_filepath):
-            print(f"ERROR: Video file was not created: {temp_filepath}")
+        return proc, partial_filepath
+
+    async def finish_video(self, proc, partial_filepath):
+        """
+        Wait for FFmpeg to finish encoding a recording and move it into place.
+        Returns the path to the final video file, or None if encoding failed.
+        """
+        try:
+            _, stderr = await asyncio.wait_for(proc.communicate(), timeout=FFMPEG_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            print("ERROR: FFmpeg timeout")
+            stderr = b''
+
+        if proc.returncode != 0:
+            print(f"ERROR: FFmpeg failed: {stderr.decode(errors='replace')}")
+            try:
+                os.remove(partial_filepath)
+            except FileNotFoundError:
+                pass
+            return None
+
+        # Verify file was created and has content (one stat, no exists/getsize race)
+        try:
+            file_size = os.stat(partial_filepath).st_size
+        except FileNotFoundError:
+            print(f"ERROR: Video file was not created: {partial_filepath}")
             return None
 
-        file_size = os.path.getsize(temp_filepath)
         print(f"Video file created: {file_size} bytes")
 
         if file_size == 0:
-            print(f"ERROR: Video file is empty: {temp_filepath}")
-            os.remove(temp_filepath)
+            print(f"ERROR: Video file is empty: {partial_filepath}")
+            os.remove(partial_filepath)
             return None
 
-        return temp_filepath
+        output_filename = partial_filepath[:-len(PARTIAL_SUFFIX)]
+        os.replace(partial_filepath, output_filename)
+
+        print(f"Video ready: {output_filename}")
+        return output_filename
 
-    def speed_up_video(self, input_path):
+    def configure_frame_format(self, cap):
         """
-        Speed up a 5-second video to 3 seconds using FFmpeg.
-        Returns the path to the final sped-up video file.
+        Keep frames in the camera's native format when it delivers MJPEG or YUYV,
+        so only the frames that go to YOLO are decoded/converted.
+        Falls back to OpenCV's BGR frames.
         """
-        # Calculate speed factor: 5s -> 3s = 1.67x speed
-        speed_factor = RECORDING_DURATION_SEC / TARGET_DURATION_SEC
-        pts_factor = 1.0 / speed_factor  # PTS factor is inverse of speed
+        # Some backends return -1 for unsupported properties
+        fourcc = (int(cap.get(cv2.CAP_PROP_FOURCC)) & 0xFFFFFFFF).to_bytes(4, 'little').decode(errors='replace')
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 
-        # Generate output filename
-        output_filename = input_path.replace('_temp.mp4', '.mp4')
+        if fourcc in ('MJPG', 'YUYV') and cap.set(cv2.CAP_PROP_CONVERT_RGB, 0):
+            # Not every backend honours CONVERT_RGB, so check what a frame actually looks like
+            ret, frame = cap.read()
 
-        print(f"Speeding up video {speed_factor:.2f}x: {input_path} -> {output_filename}")
+            # Compressed MJPEG comes back as one row of bytes
+            if ret and fourcc == 'MJPG' and frame.ndim == 2 and frame.shape[0] == 1:
+                self.frame_format = 'mjpeg'
+                return
 
-        # Use FFmpeg to speed up video
-        cmd = [
-            'ffmpeg',
-            '-i', input_path,
-            '-filter:v', f'setpts={pts_factor:.3f}*PTS',
-            '-an',  # Remove audio (webcam likely has no audio anyway)
-            '-y',  # Overwrite output file
-            output_filename
-        ]
+            # Raw YUYV may be one row of bytes or H x W x 2; only the byte count is reliable
+            if ret and fourcc == 'YUYV' and frame.size == width * height * 2:
+                self.frame_format = 'yuyv'
+                self.frame_size = (width, height)
+                return
 
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode != 0:
-                print(f"ERROR: FFmpeg failed: {result.stderr}")
-                # If FFmpeg fails, just rename the temp file as fallback
-                os.rename(input_path, output_filename)
-                return output_filename
-        except subprocess.TimeoutExpired:
-            print("ERROR: FFmpeg timeout")
-            os.rename(input_path, output_filename)
-            return output_filename
-        except Exception as e:
-            print(f"ERROR: FFmpeg exception: {e}")
-            os.rename(input_path, output_filename)
-            return output_filename
-
-        # Clean up temporary file
-        if os.path.exists(input_path):
-            os.remove(input_path)
-
-        print(f"Video ready: {output_filename}")
-        return output_filename
+        cap.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+        self.frame_format = 'bgr'
 
     def init_camera_with_retry(self, max_retries=10):
         """
@@ -215,12 +810,15 @@ class HumanDetector:
             cap = cv2.VideoCapture(CAMERA_INDEX)
 
             if cap.isOpened():
-                # Set camera properties
+                # Set camera properties (format first, V4L2 applies the size to it)
+                cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*CAMERA_FORMAT))
                 cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
                 cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
                 cap.set(cv2.CAP_PROP_FPS, FPS)
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Don't queue up stale frames
+                self.configure_frame_format(cap)
 
-                print(f"Webcam opened successfully: {FRAME_WIDTH}x{FRAME_HEIGHT} @ {FPS} FPS")
+                print(f"Webcam opened successfully: {FRAME_WIDTH}x{FRAME_HEIGHT} @ {FPS} FPS ({self.frame_format})")
                 return cap
 
             # Camera failed to open
@@ -235,68 +833,250 @@ class HumanDetector:
 
         return None
 
-    def run(self):
-        """Main loop: capture frames, detect humans, record videos."""
-        # Initialize camera with retry logic
-        cap = self.init_camera_with_retry()
-
-        if cap is None:
-            raise RuntimeError(f"Failed to open camera at index {CAMERA_INDEX} after multiple retries")
+    def write_frame_slot(self, slot, frames):
+        """Copy a batch of frames into a shared-memory slot. Returns their shapes."""
+        shapes = []
+        offset = 0
+        for frame in frames:
+            view = np.ndarray(frame.shape, dtype=np.uint8, buffer=slot.buf, offset=offset)
+            view[...] = frame
+            shapes.append(frame.shape)
+            offset += frame.nbytes
+        return shapes
+
+    def read_frame_slot(self, slot, shapes):
+        """Map a batch of frames in a shared-memory slot as numpy views, without copying."""
+        frames = []
+        offset = 0
+        for shape in shapes:
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=slot.buf, offset=offset)
+            frames.append(frame)
+            offset += frame.nbytes
+        return frames
+
+    def detect_process(self, slot_names, task_q, result_q):
+        """
+        Inference process: load the model, then run the motion gate and YOLO on
+        each batch the capture side publishes. Frames are read in place from shared memory.
+        """
+        # The main process handles Ctrl+C and terminates this process
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        self.load_model(self.model_path)
+        slots = [SharedMemory(name=name) for name in slot_names]
+        result_q.put(True)  # Ready
+
+        # Poll, so this process exits even if the main process is killed without cleaning up
+        parent = multiprocessing.parent_process()
+        while parent.is_alive():
+            try:
+                slot, shapes = task_q.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            # One bad batch must not take the detector down
+            try:
+                frames = self.read_frame_slot(slots[slot], shapes)
+
+                # Skip inference while the scene is static
+                detected = self.motion_detected(frames) and self.detect_human(frames)
+            except Exception as e:
+                print(f"ERROR: Detection failed, skipping batch: {e}")
+                detected = False
+
+            frames = None  # Release the shared-memory views
+            result_q.put(detected)
+
+        for slot in slots:
+            slot.close()
+
+    def wait_for_result(self, result_q, detect_proc):
+        """Block until the inference process replies, failing if it has died."""
+        while True:
+            try:
+                return result_q.get(timeout=1)
+            except queue.Empty:
+                if not detect_proc.is_alive():
+                    raise RuntimeError(f"Inference process exited with code {detect_proc.exitcode}")
+
+    async def capture_task(self, cap, cap_lock, frame_slots, detect_q):
+        """Read frames from the camera and hand every Nth one to the detector, in batches."""
+        loop = asyncio.get_running_loop()
+        frame_count = 0
+        batch = deque(maxlen=self.batch_size)
 
-        print("Starting detection loop...")
-        print(f"Cooldown period: {COOLDOWN_PERIOD_SEC} seconds between detections")
+        while True:
+            # Only every Nth frame is decoded for detection; the rest are grabbed and dropped
+            sample = (frame_count + 1) % PROCESS_EVERY_N_FRAMES == 0
 
-        frame_count = 0
+            # Camera calls block, so run them off the event loop
+            async with cap_lock:
+                if sample:
+                    ret, frame = await loop.run_in_executor(None, cap.read)
+                else:
+                    ret = await loop.run_in_executor(None, cap.grab)
 
-        try:
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    print("WARNING: Failed to read frame, retrying...")
-                    time.sleep(0.1)
+            if not ret:
+                print("WARNING: Failed to read frame, retrying...")
+                await asyncio.sleep(0.1)
+                continue
+
+            frame_count += 1
+
+            if not sample:
+                continue
+
+            # Send the last batch_size sampled frames once every batch_size samples
+            batch.append(frame)
+            if (frame_count // PROCESS_EVERY_N_FRAMES) % self.batch_size != 0:
+                continue
+
+            # Write into a slot the inference process isn't reading
+            slot = next(i for i in range(FRAME_SLOTS) if i != self.busy_slot)
+            if sum(frame.nbytes for frame in batch) > frame_slots[slot].size:
+                print("WARNING: Frame batch too large for shared memory, skipping...")
+                continue
+            shapes = self.write_frame_slot(frame_slots[slot], batch)
+
+            # Single-slot mailbox: replace any batch the detector hasn't picked up yet
+            if detect_q.full():
+                detect_q.get_nowait()
+            detect_q.put_nowait((slot, shapes))
+
+    async def detect_task(self, detect_q, record_q, task_q, result_q, detect_proc):
+        """Send the latest batch to the inference process and request a recording on detection."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            slot, shapes = await detect_q.get()
+
+            # Check cooldown period
+            if time.time() - self.last_detection_time < COOLDOWN_PERIOD_SEC:
+                continue
+
+            # Detect humans; capture keeps filling the other slot meanwhile
+            self.busy_slot = slot
+            task_q.put((slot, shapes))
+            detected = await loop.run_in_executor(None, self.wait_for_result, result_q, detect_proc)
+            self.busy_slot = None
+
+            if not detected:
+                continue
+
+            # Check disk space before recording
+            if not self.check_disk_space():
+                # Not enough disk space, skip recording but update cooldown
+                self.last_detection_time = time.time()
+                continue
+
+            # Human detected! Wait for the recording to finish so the
+            # frames queued meanwhile can't trigger a second clip
+            await record_q.put(time.time())
+            await record_q.join()
+
+    async def record_task(self, cap, cap_lock, record_q, encode_q):
+        """Record a clip for each detection and pass it on to be finished."""
+        while True:
+            detected_at = await record_q.get()
+
+            try:
+                print(f"Recording starts {time.time() - detected_at:.2f}s after detection")
+
+                # Recording needs exclusive access to the camera
+                async with cap_lock:
+                    recording = await self.record_video(cap)
+
+                if recording is None:
+                    print("ERROR: Failed to record video, skipping...")
                     continue
 
-                frame_count += 1
+                await encode_q.put(recording)
 
-                # Only process every Nth frame for performance
-                if frame_count % PROCESS_EVERY_N_FRAMES != 0:
-                    continue
+                # Update last detection time (cooldown)
+                self.last_detection_time = time.time()
+            finally:
+                record_q.task_done()
 
-                # Check cooldown period
-                current_time = time.time()
-                if current_time - self.last_detection_time < COOLDOWN_PERIOD_SEC:
-                    continue
+    async def encode_task(self, encode_q):
+        """Wait for FFmpeg to flush each clip while capture and detection carry on."""
+        while True:
+            proc, partial_filepath = await encode_q.get()
 
-                # Detect humans
-                if self.detect_human(frame):
-                    # Check disk space before recording
-                    if not self.check_disk_space():
-                        # Not enough disk space, skip recording but update cooldown
-                        self.last_detection_time = time.time()
-                        continue
+            final_video_path = await self.finish_video(proc, partial_filepath)
+            if final_video_path is None:
+                print("ERROR: Failed to encode video, skipping...")
+                continue
 
-                    # Human detected! Record video
-                    temp_video_path = self.record_video(cap)
+            print(f"✓ Human detection complete: {final_video_path}")
 
-                    if temp_video_path is None:
-                        print("ERROR: Failed to record video, skipping...")
-                        continue
+    async def run_pipeline(self, cap, frame_slots, task_q, result_q, detect_proc):
+        """
+        Run capture, detection, recording and encoding as concurrent stages.
+        Stages are connected by bounded queues so FFmpeg and inference overlap with the camera.
+        """
+        detect_q = asyncio.Queue(maxsize=1)
+        record_q = asyncio.Queue(maxsize=1)
+        encode_q = asyncio.Queue(maxsize=ENCODE_QUEUE_SIZE)
+        cap_lock = asyncio.Lock()
+
+        await asyncio.gather(
+            self.capture_task(cap, cap_lock, frame_slots, detect_q),
+            self.detect_task(detect_q, record_q, task_q, result_q, detect_proc),
+            self.record_task(cap, cap_lock, record_q, encode_q),
+            self.encode_task(encode_q),
+        )
+
+    def handle_sigterm(self, signum, frame):
+        """Turn SIGTERM into KeyboardInterrupt."""
+        raise KeyboardInterrupt
 
-                    # Speed up the video
-                    final_video_path = self.speed_up_video(temp_video_path)
+    def run(self):
+        """Main loop: capture frames, detect humans, record videos."""
+        # Initialize camera with retry logic
+        cap = self.init_camera_with_retry()
 
-                    print(f"✓ Human detection complete: {final_video_path}")
+        if cap is None:
+            raise RuntimeError(f"Failed to open camera at index {CAMERA_INDEX} after multiple retries")
+
+        # start.sh stops the detector with SIGTERM; shut down as for Ctrl+C so cleanup runs
+        signal.signal(signal.SIGTERM, self.handle_sigterm)
+
+        # Inference runs in its own process, so it never competes with capture for the GIL.
+        # Batches are handed over through shared memory; spawn gives it a fresh CUDA state
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        slot_size = self.batch_size * width * height * 3
+        frame_slots = [SharedMemory(create=True, size=slot_size) for _ in range(FRAME_SLOTS)]
+
+        mp_context = multiprocessing.get_context('spawn')
+        task_q = mp_context.Queue()
+        result_q = mp_context.Queue()
+        detect_proc = mp_context.Process(
+            target=self.detect_process,
+            args=([slot.name for slot in frame_slots], task_q, result_q),
+            name='detector',
+            daemon=True,
+        )
+        detect_proc.start()
+
+        try:
+            # Wait for the model to load
+            self.wait_for_result(result_q, detect_proc)
 
-                    # Update last detection time (cooldown)
-                    self.last_detection_time = time.time()
+            print("Starting detection loop...")
+            print(f"Cooldown period: {COOLDOWN_PERIOD_SEC} seconds between detections")
 
-                    # Wait a moment before resuming detection
-                    time.sleep(2)
+            asyncio.run(self.run_pipeline(cap, frame_slots, task_q, result_q, detect_proc))
 
         except KeyboardInterrupt:
             print("\nStopping detector...")
 
         finally:
+            detect_proc.terminate()
+            detect_proc.join()
+            for slot in frame_slots:
+                slot.close()
+                slot.unlink()
             cap.release()
             print("Webcam released. Goodbye!")
 